@@ -6,16 +6,29 @@ Provides semantic search, advice synthesis, and expert comparison.
 """
 
 import os
+import re
+import sys
 import json
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any
 
+import httpx
+import numpy as np
+from cachetools import LRUCache, TTLCache
+from diskcache import Cache, FanoutCache
 from dotenv import load_dotenv
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent
-from supabase import create_client, Client
+from supabase import create_client, Client, ClientOptions
 import google.generativeai as genai
+from google.generativeai.protos import Candidate
 
 # Load environment variables
 load_dotenv(Path(__file__).parent.parent / ".env")
@@ -26,63 +39,495 @@ SUPABASE_KEY = os.getenv("NEXT_PUBLIC_SUPABASE_PUBLISHABLE_DEFAULT_KEY")
 GEMINI_API_KEY = os.getenv("GEMIMI_API_KEY")
 
 EMBEDDING_MODEL = "models/text-embedding-004"
+EMBEDDING_DIMENSIONS = 768
 LLM_MODEL = "gemini-1.5-flash"
+CACHE_DIR = Path(__file__).parent.parent / ".cache"
+HNSW_EF_SEARCH = 100  # HNSW search queue size per query (recall vs. latency)
+HNSW_EF_SEARCH_PER_FACET = 60  # Per-facet queue size when a tool searches several facets
+RRF_K = 60  # Reciprocal rank fusion damping constant
+
+# Prompt context budget for the synthesis tools (tokens estimated as chars / 4)
+CONTEXT_TOKEN_BUDGET = 2500
+CHUNK_TOKEN_LIMIT = 400
+MMR_LAMBDA = 0.7  # Relevance vs. diversity trade-off when picking context chunks
+RETRIEVAL_CACHE_TTL = 600  # Seconds a retrieved + formatted context is reused
+
+# Static prompt text, sent as the system instruction so every call shares an
+# identical prefix and only the retrieved context + question vary
+SYSTEM_PROMPT = """You are a C-level advisor with access to wisdom from 269 podcast episodes 
+featuring top operators like Brian Chesky, Marty Cagan, Elena Verna, Shreyas Doshi, and more.
+
+Based on the expert insights provided, give helpful, actionable advice.
+Always attribute specific insights to the speaker who said them.
+
+Provide a thoughtful, well-structured response that synthesizes the expert perspectives.
+Include specific quotes and attributions where relevant."""
+
+# Fixed per-tool instructions, appended to the system prompt
+SYNTHESIS_INSTRUCTIONS = {
+    "advice": "",
+    "comparison": "",
+    "playbook": """Structure the playbook with:
+1. Key principles from experts
+2. Step-by-step actions
+3. Common pitfalls to avoid
+4. Success metrics to track""",
+    "metrics": "Include specific numbers and targets where mentioned.",
+}
+
+# Synthesized responses are reused for questions at least this similar that
+# also use the same key terms (see _semantic_cache_params)
+SEMANTIC_CACHE_THRESHOLD = 0.97
+# How long a synthesized response stays fresh, per kind of synthesis (seconds)
+RESPONSE_CACHE_TTL = {
+    "advice": 7 * 24 * 3600,
+    "comparison": 7 * 24 * 3600,
+    "playbook": 30 * 24 * 3600,
+    "metrics": 24 * 3600,
+}
+# How long a complete tool result is reused for identical arguments (seconds)
+TOOL_CACHE_TTL = {
+    "search_wisdom": 24 * 3600,
+    "get_advice": 7 * 24 * 3600,
+    "compare_experts": 7 * 24 * 3600,
+    "generate_playbook": 30 * 24 * 3600,
+    "find_metrics": 24 * 3600,
+    "list_episodes": 3600,  # view counts go stale
+}
 
 # Initialize clients
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+# One pooled HTTP/2 client shared by every Supabase call, so tool invocations
+# reuse warm TLS connections instead of reconnecting
+http_client = httpx.Client(
+    http2=True,
+    timeout=30.0,
+    limits=httpx.Limits(max_keepalive_connections=32, keepalive_expiry=60)
+)
+supabase: Client = create_client(
+    SUPABASE_URL,
+    SUPABASE_KEY,
+    options=ClientOptions(httpx_client=http_client)
+)
 genai.configure(api_key=GEMINI_API_KEY)
-llm = genai.GenerativeModel(LLM_MODEL)
+# One model per kind of synthesis, each with its static instructions baked in
+llms = {
+    kind: genai.GenerativeModel(
+        LLM_MODEL,
+        system_instruction=f"{SYSTEM_PROMPT}\n\n{instructions}".strip()
+    )
+    for kind, instructions in SYNTHESIS_INSTRUCTIONS.items()
+}
+
+# Embedding caches: in-process LRU for the session hot set, disk for reuse across sessions
+embedding_memo: LRUCache = LRUCache(maxsize=4096)
+# get_embeddings runs in to_thread workers and LRUCache is not thread-safe
+embedding_memo_lock = threading.Lock()
+embedding_cache = Cache(str(CACHE_DIR / "embeddings"))
+# diskcache reads and writes are blocking SQLite calls, so async code goes
+# through asyncio.to_thread
+response_cache = Cache(str(CACHE_DIR / "responses"))
+retrieval_cache: TTLCache = TTLCache(maxsize=256, ttl=RETRIEVAL_CACHE_TTL)
+# Sharded so concurrent tool calls do not contend on one SQLite writer
+tool_cache = FanoutCache(str(CACHE_DIR / "tools"), shards=4)
 
 # Initialize MCP server
 server = Server("lenny-wisdom")
+logger = logging.getLogger("lenny-wisdom")
+
 
+def _embedding_key(text: str) -> str:
+    """Cache key for an embedding; includes the model so swaps never return stale vectors."""
+    return hashlib.sha256(f"{EMBEDDING_MODEL}\x00{text}".encode("utf-8")).hexdigest()
 
-def get_embedding(text: str) -> list[float]:
+
+def _request_embeddings(texts: list[str]) -> list[list[float]]:
+    """Embed texts with Gemini in a single batch request.
+    
+    Passing a list to `embed_content` posts to `batchEmbedContents`, so N
+    texts cost one round-trip instead of N. Falls back to one request per
+    text if the batch call fails.
+    """
+    try:
+        result = genai.embed_content(
+            model=EMBEDDING_MODEL,
+            content=texts,
+            task_type="retrieval_query"
+        )
+        return result["embedding"]
+    except Exception:
+        return [
+            genai.embed_content(
+                model=EMBEDDING_MODEL,
+                content=text,
+                task_type="retrieval_query"
+            )["embedding"]
+            for text in texts
+        ]
+
+
+def get_embeddings(texts: list[str]) -> list[np.ndarray]:
+    """Generate float32 embeddings for several texts, only calling Gemini for cache misses."""
+    embeddings: list[np.ndarray | None] = [None] * len(texts)
+    misses = []
+    
+    for i, text in enumerate(texts):
+        key = _embedding_key(text)
+        with embedding_memo_lock:
+            embedding = embedding_memo.get(key)
+        if embedding is None:
+            raw = embedding_cache.get(key)
+            if raw is not None:
+                embedding = np.frombuffer(raw, dtype=np.float16).astype(np.float32)
+                with embedding_memo_lock:
+                    embedding_memo[key] = embedding
+        if embedding is None:
+            misses.append(i)
+        else:
+            embeddings[i] = embedding
+    
+    if misses:
+        fetched = _request_embeddings([texts[i] for i in misses])
+        for i, values in zip(misses, fetched):
+            key = _embedding_key(texts[i])
+            embedding = np.asarray(values, dtype=np.float32)
+            with embedding_memo_lock:
+                embedding_memo[key] = embedding
+            # float16 on disk halves storage; precision is ample for cosine ranking
+            embedding_cache.set(key, embedding.astype(np.float16).tobytes())
+            embeddings[i] = embedding
+    
+    return embeddings
+
+
+def get_embedding(text: str) -> np.ndarray:
     """Generate embedding for text using Gemini."""
-    result = genai.embed_content(
-        model=EMBEDDING_MODEL,
-        content=text,
-        task_type="retrieval_query"
-    )
-    return result["embedding"]
+    return get_embeddings([text])[0]
 
 
-def search_similar_chunks(query: str, limit: int = 10, min_similarity: float = 0.5) -> list[dict]:
-    """Search for similar chunks using vector similarity."""
-    query_embedding = get_embedding(query)
+def _to_pgvector_literal(embedding: np.ndarray) -> str:
+    """Format an embedding as a pgvector text literal for RPC payloads.
     
+    Six significant digits is beyond float16/halfvec precision and about
+    half the size of JSON-encoding full Python floats, which keeps search
+    payloads small and cheap to serialize.
+    """
+    return "[" + ",".join(f"{x:.6g}" for x in embedding.tolist()) + "]"
+
+
+def _search_chunks_rpc(query_embedding: np.ndarray, params: dict[str, Any]) -> list[dict]:
+    """Run the search_chunks RPC for a single query embedding.
+    
+    `params` holds the remaining search_chunks arguments (match_count, ...).
+    """
     # Call the search function we created in Supabase
     result = supabase.rpc(
         "search_chunks",
+        {"query_embedding": _to_pgvector_literal(query_embedding), **params}
+    ).execute()
+    return result.data or []
+
+
+async def search_similar_chunks(
+    queries: str | list[str],
+    limit: int = 10,
+    min_similarity: float = 0.5,
+    include_embeddings: bool = False,
+    experts: list[str] | None = None,
+    preview_chars: int | None = None
+) -> list[dict]:
+    """Search for similar chunks using vector similarity.
+    
+    Accepts a single query or several query facets. All facets are embedded
+    in one batch request, searched concurrently, and merged with reciprocal
+    rank fusion so chunks that rank well for several facets come first.
+    Set include_embeddings to get each chunk's vector (for MMR re-ranking),
+    experts to only match chunks from episodes featuring those guests, and
+    preview_chars to have the database truncate content (rows then carry a
+    `truncated` flag).
+    """
+    if isinstance(queries, str):
+        queries = [queries]
+    
+    query_embeddings = await asyncio.to_thread(get_embeddings, queries)
+    
+    params = {
+        "match_threshold": min_similarity,
+        "match_count": limit,
+        # Shrink the per-facet search queue so total index work stays roughly constant
+        "ef_search": HNSW_EF_SEARCH if len(queries) == 1 else HNSW_EF_SEARCH_PER_FACET,
+        "include_embedding": include_embeddings,
+        "expert_names": experts or None,
+        "preview_chars": preview_chars
+    }
+    result_lists = await asyncio.gather(*(
+        asyncio.to_thread(_search_chunks_rpc, query_embedding, params)
+        for query_embedding in query_embeddings
+    ))
+    
+    # A chunk appears once per guest of its episode, so dedupe on both
+    scores: dict[tuple, float] = {}
+    rows: dict[tuple, dict] = {}
+    for results in result_lists:
+        for rank, r in enumerate(results, start=1):
+            key = (r["chunk_id"], r.get("guest_name"))
+            scores[key] = scores.get(key, 0.0) + 1.0 / (RRF_K + rank)
+            if key not in rows or r["distance"] < rows[key]["distance"]:
+                rows[key] = r
+    
+    ranked = sorted(scores, key=scores.get, reverse=True)
+    return [rows[key] for key in ranked[:limit]]
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token count for Gemini prompts (~4 characters per token)."""
+    return len(text) // 4
+
+
+def select_context_chunks(results: list[dict], token_budget: int = CONTEXT_TOKEN_BUDGET) -> list[dict]:
+    """Pick relevant but non-redundant chunks that fit the prompt token budget.
+    
+    Greedy maximal marginal relevance: each step takes the chunk maximizing
+    `λ·similarity(query) − (1−λ)·max similarity(already selected)`. Chunk
+    content is truncated to CHUNK_TOKEN_LIMIT tokens.
+    """
+    if not results:
+        return []
+    
+    # Unit-normalized (K, 768) matrix; chunks without a vector get a zero row
+    # and so never count as redundant
+    matrix = np.zeros((len(results), EMBEDDING_DIMENSIONS), dtype=np.float32)
+    for i, r in enumerate(results):
+        embedding = r.get("embedding")
+        if embedding is not None:
+            # PostgREST returns pgvector values as "[x,y,...]" strings
+            matrix[i] = json.loads(embedding) if isinstance(embedding, str) else embedding
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix /= np.where(norms > 0, norms, 1.0)
+    
+    # All pairwise cosine similarities in one BLAS matmul
+    similarity = matrix @ matrix.T
+    relevance = 1.0 - np.array([r["distance"] for r in results], dtype=np.float32)
+    redundancy = np.zeros(len(results), dtype=np.float32)
+    available = np.ones(len(results), dtype=bool)
+    
+    max_chars = CHUNK_TOKEN_LIMIT * 4
+    selected: list[dict] = []
+    used_tokens = 0
+    while available.any():
+        scores = MMR_LAMBDA * relevance - (1 - MMR_LAMBDA) * redundancy
+        best = int(np.argmax(np.where(available, scores, -np.inf)))
+        available[best] = False
+        
+        r = results[best]
+        content = r["content"] if len(r["content"]) <= max_chars else r["content"][:max_chars] + "..."
+        tokens = _estimate_tokens(content)
+        if selected and used_tokens + tokens > token_budget:
+            break
+        
+        selected.append({**r, "content": content})
+        redundancy = np.maximum(redundancy, similarity[best])
+        used_tokens += tokens
+    
+    return selected
+
+
+async def _build_expert_context(
+    queries: str | list[str],
+    limit: int,
+    experts: list[str] | None = None
+) -> tuple[list[dict], str]:
+    """Retrieve chunks for the queries and format them as LLM prompt context.
+    
+    Memoized per (queries, limit, experts) for RETRIEVAL_CACHE_TTL, so tools
+    called back-to-back with overlapping queries reuse the retrieval. Empty
+    retrievals are not memoized.
+    """
+    if isinstance(queries, str):
+        queries = [queries]
+    
+    key = (tuple(queries), limit, tuple(experts or ()))
+    cached = retrieval_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    results = await search_similar_chunks(queries, limit=limit, include_embeddings=True, experts=experts)
+    expert_context = "\n\n".join(
+        f"**{r['guest_name']}** ({r['episode_title']}):\n{r['content']}"
+        for r in select_context_chunks(results)
+    )
+    
+    # The vectors were only needed for MMR; don't hold them in the cache
+    results = [{k: v for k, v in r.items() if k != "embedding"} for r in results]
+    if results:
+        retrieval_cache[key] = (results, expert_context)
+    return results, expert_context
+
+
+def _normalize_cache_param(value: Any) -> Any:
+    """Canonical form of a parameter a cached response must match exactly."""
+    if isinstance(value, str):
+        return " ".join(value.split()).casefold()
+    if isinstance(value, (list, tuple)):
+        return sorted({_normalize_cache_param(v) for v in value})
+    return value
+
+
+# Words that don't change what a question asks; every other word (and every
+# figure like "$10M" or "20%") must appear in both questions for a cache hit
+_CACHE_STOPWORDS = frozenset(
+    "a about an and are as at be best by can could do does for from how i "
+    "in is it me my of on or our should the their to us we what when "
+    "which who why will with would you your".split()
+)
+_CACHE_TERM_RE = re.compile(r"[$€£]?\d+(?:[.,]\d+)*[%kmbx]?|[^\W\d_]+")
+
+
+def _question_terms(text: str) -> list[str]:
+    """Sorted distinct content words and figures of a question."""
+    return sorted({t for t in _CACHE_TERM_RE.findall(text.casefold()) if t not in _CACHE_STOPWORDS})
+
+
+def _semantic_cache_params(question: str, params: dict[str, Any] | None) -> dict[str, Any]:
+    """Parameters a semantically matched response must share exactly.
+    
+    Besides the caller's normalized params, the question's key terms are
+    included, so rephrasings ("How do I hire a VP of Sales?" / "hire VP
+    sales") can share an answer but questions that differ in a fact
+    ("VP Sales at $1M ARR" / "VP Marketing at $10M ARR") cannot.
+    """
+    normalized = {name: _normalize_cache_param(value) for name, value in (params or {}).items()}
+    normalized["terms"] = _question_terms(question)
+    return normalized
+
+
+def _lookup_similar_response(question_embedding: np.ndarray, kind: str, params: dict[str, Any]) -> str | None:
+    """Return a cached response for a near-identical question with the same kind and params, if any."""
+    result = supabase.rpc(
+        "match_cached_response",
         {
-            "query_embedding": query_embedding,
-            "match_threshold": min_similarity,
-            "match_count": limit
+            "query_embedding": _to_pgvector_literal(question_embedding),
+            "cache_kind": kind,
+            "cache_params": params,
+            "match_threshold": SEMANTIC_CACHE_THRESHOLD
         }
     ).execute()
-    
-    return result.data or []
+    return result.data[0]["response"] if result.data else None
 
 
-def synthesize_with_llm(prompt: str, context: str) -> str:
-    """Generate a response using Gemini LLM with context."""
-    full_prompt = f"""You are a C-level advisor with access to wisdom from 269 podcast episodes 
-featuring top operators like Brian Chesky, Marty Cagan, Elena Verna, Shreyas Doshi, and more.
+def _store_similar_response(
+    question: str, question_embedding: np.ndarray, response: str, kind: str, params: dict[str, Any]
+) -> None:
+    """Record a synthesized response in the semantic cache."""
+    expires_at = datetime.now(timezone.utc) + timedelta(seconds=RESPONSE_CACHE_TTL[kind])
+    supabase.table("response_cache").insert({
+        "kind": kind,
+        "prompt": question,
+        "prompt_embedding": _to_pgvector_literal(question_embedding),
+        "params": params,
+        "response": response,
+        "expires_at": expires_at.isoformat()
+    }).execute()
 
-Based on the following expert insights, provide helpful, actionable advice.
-Always attribute specific insights to the speaker who said them.
 
-CONTEXT FROM EXPERT INTERVIEWS:
+async def _report_progress(progress: float, message: str | None = None) -> None:
+    """Send an MCP progress notification if the client asked for them."""
+    try:
+        ctx = server.request_context
+    except LookupError:
+        return
+    
+    progress_token = ctx.meta.progressToken if ctx.meta else None
+    if progress_token is None:
+        return
+    
+    await ctx.session.send_progress_notification(progress_token, progress, message=message)
+
+
+async def synthesize_with_llm(
+    prompt: str,
+    context: str,
+    kind: str,
+    question: str,
+    params: dict[str, Any] | None = None
+) -> tuple[str, bool]:
+    """Generate a response using Gemini LLM with context.
+    
+    Responses are cached in two tiers: an exact match on prompt + context on
+    local disk, then a semantic match in Supabase. The semantic tier embeds
+    only the user's main free-text input (`question`), not the templated
+    prompt, and requires `params` (e.g. the experts list, the situation or
+    constraints text) and the question's key terms to match exactly after
+    normalization. It is best-effort and never fails the call.
+    
+    Generation is streamed: each partial chunk is forwarded as a progress
+    notification (when the client sent a progress token), and the full text
+    is returned once complete, since MCP tool results are not incremental.
+    
+    Returns the text and whether it may be cached. A generation the model
+    stops early (e.g. SAFETY) comes back as the partial text plus a note,
+    flagged as not cacheable.
+    """
+    ttl = RESPONSE_CACHE_TTL[kind]
+    key = hashlib.sha256(f"{kind}|{prompt}|{context[:8000]}".encode("utf-8")).hexdigest()
+    
+    cached = await asyncio.to_thread(response_cache.get, key)
+    if cached is not None:
+        return cached, True
+    
+    params = _semantic_cache_params(question, params)
+    question_embedding = None
+    try:
+        question_embedding = await asyncio.to_thread(get_embedding, question)
+        cached = await asyncio.to_thread(_lookup_similar_response, question_embedding, kind, params)
+    except Exception:
+        cached = None
+    if cached is not None:
+        await asyncio.to_thread(response_cache.set, key, cached, expire=ttl)
+        return cached, True
+    
+    full_prompt = f"""CONTEXT FROM EXPERT INTERVIEWS:
 {context}
 
 USER QUESTION:
-{prompt}
-
-Provide a thoughtful, well-structured response that synthesizes the expert perspectives.
-Include specific quotes and attributions where relevant."""
+{prompt}"""
 
-    response = llm.generate_content(full_prompt)
-    return response.text
+    started = time.perf_counter()
+    parts = []
+    finish_reason = None
+    stream = await llms[kind].generate_content_async(full_prompt, stream=True)
+    async for chunk in stream:
+        # The last chunk (or one cut by a safety filter) may carry only a
+        # finish_reason and no parts, where chunk.text would raise
+        if not chunk.candidates:
+            continue
+        candidate = chunk.candidates[0]
+        if candidate.finish_reason:
+            finish_reason = candidate.finish_reason
+        text = "".join(part.text for part in candidate.content.parts)
+        if not text:
+            continue
+        if not parts:
+            logger.info("%s: first token after %.0f ms", kind, (time.perf_counter() - started) * 1000)
+        parts.append(text)
+        await _report_progress(len(parts), text)
+    response = "".join(parts)
+    
+    # SAFETY, RECITATION etc.: return what was streamed, marked as cut
+    # short, and keep it out of every cache so a retry can do better
+    if finish_reason not in (None, Candidate.FinishReason.STOP, Candidate.FinishReason.MAX_TOKENS):
+        reason = Candidate.FinishReason(finish_reason).name
+        logger.warning("%s: generation stopped early (%s) after %d chunks", kind, reason, len(parts))
+        note = f"_(The answer was cut short by the model: {reason}. Try rephrasing the request.)_"
+        return (f"{response}\n\n{note}" if response else note), False
+    
+    await asyncio.to_thread(response_cache.set, key, response, expire=ttl)
+    if question_embedding is not None:
+        try:
+            await asyncio.to_thread(_store_similar_response, question, question_embedding, response, kind, params)
+        except Exception:
+            pass
+    
+    return response, True
 
 
 # Define MCP Tools
@@ -191,7 +636,7 @@ TOOLS = [
                 },
                 "search": {
                     "type": "string",
-                    "description": "Search in episode titles and descriptions"
+                    "description": "Search in episode titles and descriptions. Matches whole words (stemmed, so 'hiring' finds 'hire'), not word fragments; supports \"quoted phrases\", OR and -exclusions"
                 },
                 "sort": {
                     "type": "string",
@@ -217,138 +662,147 @@ async def list_tools() -> list[Tool]:
 
 @server.call_tool()
 async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
-    """Handle tool calls."""
+    """Handle tool calls, answering repeated calls from the tool cache.
+    
+    Identical (tool, arguments) pairs skip embedding, search and synthesis
+    entirely until their per-tool TTL expires.
+    """
+    ttl = TOOL_CACHE_TTL.get(name)
+    if ttl is None:
+        contents, _ = await run_tool(name, arguments)
+        return contents
+    
+    payload = json.dumps([name, arguments], sort_keys=True, default=str)
+    key = hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+    
+    cached = await asyncio.to_thread(tool_cache.get, key)
+    if cached is not None:
+        return [TextContent(type="text", text=text) for text in cached]
+    
+    contents, cacheable = await run_tool(name, arguments)
+    if cacheable:
+        await asyncio.to_thread(tool_cache.set, key, [c.text for c in contents], expire=ttl)
+    return contents
+
+
+async def run_tool(name: str, arguments: dict[str, Any]) -> tuple[list[TextContent], bool]:
+    """Run a tool call without the tool cache.
+    
+    Returns the contents and whether they may be cached: empty results
+    ("No ... found") are not, so they don't outlive ingestion or a brief
+    Supabase outage.
+    """
     
     if name == "search_wisdom":
         query = arguments.get("query", "")
         limit = arguments.get("limit", 5)
         
-        results = search_similar_chunks(query, limit=limit)
+        # Only the first 500 characters are shown, so let the database cut them
+        results = await search_similar_chunks(query, limit=limit, preview_chars=500)
         
         if not results:
-            return [TextContent(type="text", text="No relevant results found.")]
+            return [TextContent(type="text", text="No relevant results found.")], False
         
         # Format results
-        formatted = []
-        for r in results:
-            formatted.append(
-                f"**{r['guest_name']}** in *{r['episode_title']}* ({r['timestamp_start']}):\n"
-                f"> {r['content'][:500]}{'...' if len(r['content']) > 500 else ''}\n"
-                f"(Similarity: {r['similarity']:.2f})"
-            )
+        formatted = "\n\n---\n\n".join(
+            f"**{r['guest_name']}** in *{r['episode_title']}* ({r['timestamp_start']}):\n"
+            f"> {r['content']}{'...' if r['truncated'] else ''}\n"
+            f"(Similarity: {1 - r['distance']:.2f})"
+            for r in results
+        )
         
-        return [TextContent(type="text", text="\n\n---\n\n".join(formatted))]
+        return [TextContent(type="text", text=formatted)], True
     
     elif name == "get_advice":
         challenge = arguments.get("challenge", "")
         context = arguments.get("context", "")
         
-        # Search for relevant chunks
-        search_query = f"{challenge} {context}".strip()
-        results = search_similar_chunks(search_query, limit=8)
+        # Search the challenge and the situation as separate facets
+        queries = [q for q in (challenge, context) if q]
+        results, expert_context = await _build_expert_context(queries, limit=8)
         
         if not results:
-            return [TextContent(type="text", text="No relevant expert insights found for this challenge.")]
+            return [TextContent(type="text", text="No relevant expert insights found for this challenge.")], False
         
-        # Build context from results
-        expert_context = "\n\n".join([
-            f"**{r['guest_name']}** ({r['episode_title']}):\n{r['content']}"
-            for r in results
-        ])
-        
-        # Synthesize advice
-        advice = synthesize_with_llm(challenge, expert_context)
+        # Synthesize advice (the situation is part of the question, so it keys the cache too)
+        advice_prompt = f"{challenge}\n\nMy situation: {context}" if context else challenge
+        advice, cacheable = await synthesize_with_llm(
+            advice_prompt, expert_context, "advice", question=challenge, params={"context": context}
+        )
         
-        return [TextContent(type="text", text=advice)]
+        return [TextContent(type="text", text=advice)], cacheable
     
     elif name == "compare_experts":
         topic = arguments.get("topic", "")
         experts = arguments.get("experts", [])
         
-        # Search for relevant chunks
-        results = search_similar_chunks(topic, limit=15)
-        
-        if experts:
-            # Filter to specific experts
-            results = [r for r in results if any(
-                expert.lower() in (r.get("guest_name") or "").lower() 
-                for expert in experts
-            )]
+        # Search for relevant chunks (the expert filter runs in the database)
+        results, expert_context = await _build_expert_context(topic, limit=15, experts=experts)
         
         if not results:
-            return [TextContent(type="text", text="No relevant expert viewpoints found.")]
-        
-        # Build context
-        expert_context = "\n\n".join([
-            f"**{r['guest_name']}** ({r['episode_title']}):\n{r['content']}"
-            for r in results
-        ])
+            return [TextContent(type="text", text="No relevant expert viewpoints found.")], False
         
         # Generate comparison
         comparison_prompt = f"Compare the different expert viewpoints on: {topic}"
-        comparison = synthesize_with_llm(comparison_prompt, expert_context)
+        if experts:
+            comparison_prompt += f" (focusing on {', '.join(experts)})"
+        comparison, cacheable = await synthesize_with_llm(
+            comparison_prompt, expert_context, "comparison", question=topic, params={"experts": experts}
+        )
         
-        return [TextContent(type="text", text=comparison)]
+        return [TextContent(type="text", text=comparison)], cacheable
     
     elif name == "generate_playbook":
         goal = arguments.get("goal", "")
         constraints = arguments.get("constraints", "")
         
-        # Search for relevant chunks
-        search_query = f"how to {goal} best practices steps"
-        results = search_similar_chunks(search_query, limit=10)
+        # Search the goal and its constraints as separate facets
+        queries = [f"how to {goal} best practices steps"]
+        if constraints:
+            queries.append(f"{goal} {constraints}")
+        results, expert_context = await _build_expert_context(queries, limit=10)
         
         if not results:
-            return [TextContent(type="text", text="No relevant expert insights found for this goal.")]
-        
-        # Build context
-        expert_context = "\n\n".join([
-            f"**{r['guest_name']}** ({r['episode_title']}):\n{r['content']}"
-            for r in results
-        ])
+            return [TextContent(type="text", text="No relevant expert insights found for this goal.")], False
         
         # Generate playbook
         playbook_prompt = f"""Generate a step-by-step playbook for: {goal}
         
-Constraints: {constraints if constraints else 'None specified'}
-
-Structure the playbook with:
-1. Key principles from experts
-2. Step-by-step actions
-3. Common pitfalls to avoid
-4. Success metrics to track"""
+Constraints: {constraints if constraints else 'None specified'}"""
         
-        playbook = synthesize_with_llm(playbook_prompt, expert_context)
+        playbook, cacheable = await synthesize_with_llm(
+            playbook_prompt, expert_context, "playbook", question=goal, params={"constraints": constraints}
+        )
         
-        return [TextContent(type="text", text=playbook)]
+        return [TextContent(type="text", text=playbook)], cacheable
     
     elif name == "find_metrics":
         category = arguments.get("category", "")
         context = arguments.get("context", "")
         
-        # Search for metric-related chunks
-        search_query = f"{category} metrics KPIs benchmarks {context}"
-        results = search_similar_chunks(search_query, limit=8)
+        # Search for metric-related chunks, with the context as its own facet
+        queries = [f"{category} metrics KPIs benchmarks"]
+        if context:
+            queries.append(f"{category} metrics for {context}")
+        results, expert_context = await _build_expert_context(queries, limit=8)
         
         if not results:
-            return [TextContent(type="text", text="No relevant metrics or benchmarks found.")]
-        
-        # Build context
-        expert_context = "\n\n".join([
-            f"**{r['guest_name']}** ({r['episode_title']}):\n{r['content']}"
-            for r in results
-        ])
+            return [TextContent(type="text", text="No relevant metrics or benchmarks found.")], False
         
         # Generate metrics summary
         metrics_prompt = f"""Extract and summarize the key metrics, KPIs, and benchmarks mentioned for:
 Category: {category}
-Context: {context if context else 'General'}
-
-Include specific numbers and targets where mentioned."""
-        
-        metrics = synthesize_with_llm(metrics_prompt, expert_context)
+Context: {context if context else 'General'}"""
+        
+        metrics, cacheable = await synthesize_with_llm(
+            metrics_prompt,
+            expert_context,
+            "metrics",
+            question="\n".join(q for q in (category, context) if q),
+            params={"category": category, "context": context}
+        )
         
-        return [TextContent(type="text", text=metrics)]
+        return [TextContent(type="text", text=metrics)], cacheable
     
     elif name == "list_episodes":
         guest = arguments.get("guest")
@@ -356,34 +810,45 @@ Include specific numbers and targets where mentioned."""
         sort = arguments.get("sort", "views")
         limit = arguments.get("limit", 10)
         
-        # Build query
-        query = supabase.table("episodes").select(
-            "title, slug, youtube_url, duration_display, view_count, description"
-        )
-        
-        if search:
-            query = query.or_(f"title.ilike.%{search}%,description.ilike.%{search}%")
-        
-        # Sort
-        if sort == "views":
-            query = query.order("view_count", desc=True)
-        elif sort == "duration":
-            query = query.order("duration_seconds", desc=True)
+        if guest:
+            # The guest join, search and sort all run in one RPC
+            query = supabase.rpc(
+                "list_episodes_by_guest",
+                {
+                    "guest_name": guest,
+                    "search": search,
+                    "sort_by": sort,
+                    "lim": limit
+                }
+            )
+        elif search:
+            # Full-text search; the search text is bound as an RPC parameter
+            query = supabase.rpc(
+                "search_episodes",
+                {
+                    "q": search,
+                    "sort_by": sort,
+                    "lim": limit
+                }
+            )
+        else:
+            # Build query
+            query = supabase.table("episodes").select(
+                "id, title, slug, youtube_url, duration_display, view_count, description"
+            )
+            
+            # Sort (NULLS LAST matches the descending indexes)
+            if sort == "views":
+                query = query.order("view_count", desc=True, nullsfirst=False)
+            elif sort == "duration":
+                query = query.order("duration_seconds", desc=True, nullsfirst=False)
+            
+            query = query.limit(limit)
         
-        query = query.limit(limit)
-        result = query.execute()
+        result = await asyncio.to_thread(query.execute)
         
         if not result.data:
-            return [TextContent(type="text", text="No episodes found.")]
-        
-        # If filtering by guest, we need to join
-        if guest:
-            guest_result = supabase.table("guests").select("id").ilike("name", f"%{guest}%").execute()
-            if guest_result.data:
-                guest_ids = [g["id"] for g in guest_result.data]
-                episode_guests = supabase.table("episode_guests").select("episode_id").in_("guest_id", guest_ids).execute()
-                episode_ids = [eg["episode_id"] for eg in episode_guests.data]
-                result.data = [e for e in result.data if e.get("id") in episode_ids]
+            return [TextContent(type="text", text="No episodes found.")], False
         
         # Format results
         formatted = []
@@ -394,17 +859,49 @@ Include specific numbers and targets where mentioned."""
                 f"URL: {e['youtube_url']}"
             )
         
-        return [TextContent(type="text", text="\n\n".join(formatted))]
+        return [TextContent(type="text", text="\n\n".join(formatted))], True
+    
+    return [TextContent(type="text", text=f"Unknown tool: {name}")], False
+
+
+async def warm_up() -> None:
+    """Open Supabase/Gemini connections and page in caches before the first tool call.
+    
+    Failures are logged and otherwise ignored; the first real call simply
+    pays the cold-start cost instead.
+    """
+    async def warm_search() -> None:
+        # Always hits Gemini (bypasses the embedding cache) so its channel is live,
+        # then walks the HNSW index once so its upper layers are in page cache
+        embedding = np.asarray((await asyncio.to_thread(_request_embeddings, ["warmup"]))[0], dtype=np.float32)
+        await asyncio.to_thread(_search_chunks_rpc, embedding, {"match_threshold": 0.99, "match_count": 1})
     
-    return [TextContent(type="text", text=f"Unknown tool: {name}")]
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        warm_search(),
+        asyncio.to_thread(supabase.table("episodes").select("id").limit(1).execute),
+        asyncio.to_thread(embedding_cache.expire),
+        asyncio.to_thread(response_cache.expire),
+        asyncio.to_thread(tool_cache.expire),
+        return_exceptions=True
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning("Warm-up step failed: %s", result)
+    logger.info("Warm-up finished in %.0f ms", (time.perf_counter() - started) * 1000)
 
 
 async def main():
     """Run the MCP server."""
+    # stdout carries the MCP protocol, so logs go to stderr
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    
     async with stdio_server() as (read_stream, write_stream):
+        # Warm up alongside the MCP handshake rather than delaying it
+        warm_up_task = asyncio.create_task(warm_up())
         await server.run(read_stream, write_stream, server.create_initialization_options())
+        await warm_up_task
 
 
 if __name__ == "__main__":
-    import asyncio
     asyncio.run(main())
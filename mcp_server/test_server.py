@@ -3,19 +3,8 @@ Test script for Lenny's Wisdom MCP Server.
 Tests the core functions without the MCP protocol.
 """
 
-import os
-from pathlib import Path
-from dotenv import load_dotenv
-from supabase import create_client
-import google.generativeai as genai
-
-# Load environment variables
-load_dotenv(Path(__file__).parent.parent / ".env")
-
-SUPABASE_URL = os.getenv("NEXT_PUBLIC_SUPABASE_URL")
-SUPABASE_KEY = os.getenv("NEXT_PUBLIC_SUPABASE_PUBLISHABLE_DEFAULT_KEY")
-GEMINI_API_KEY = os.getenv("GEMIMI_API_KEY")
-EMBEDDING_MODEL = "models/text-embedding-004"
+# Reuse the server's configured clients instead of building new ones
+from server import supabase, get_embedding, _semantic_cache_params
 
 print("=" * 50)
 print("Testing Lenny's Wisdom MCP Server")
@@ -24,7 +13,6 @@ print("=" * 50)
 # Test 1: Supabase connection
 print("\n1. Testing Supabase connection...")
 try:
-    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
     result = supabase.table("episodes").select("title, slug").limit(3).execute()
     print(f"   ✓ Connected! Found {len(result.data)} episodes:")
     for ep in result.data:
@@ -35,14 +23,8 @@ except Exception as e:
 # Test 2: Gemini embeddings
 print("\n2. Testing Gemini embeddings...")
 try:
-    genai.configure(api_key=GEMINI_API_KEY)
     test_text = "How should I structure my product team?"
-    result = genai.embed_content(
-        model=EMBEDDING_MODEL,
-        content=test_text,
-        task_type="retrieval_query"
-    )
-    embedding = result["embedding"]
+    embedding = get_embedding(test_text)
     print(f"   ✓ Generated embedding with {len(embedding)} dimensions")
 except Exception as e:
     print(f"   ✗ Error: {e}")
@@ -52,18 +34,13 @@ print("\n3. Testing semantic search...")
 try:
     # Get embedding for query
     query = "product management best practices"
-    query_result = genai.embed_content(
-        model=EMBEDDING_MODEL,
-        content=query,
-        task_type="retrieval_query"
-    )
-    query_embedding = query_result["embedding"]
+    query_embedding = get_embedding(query)
     
     # Search using the function we created
     search_result = supabase.rpc(
         "search_chunks",
         {
-            "query_embedding": query_embedding,
+            "query_embedding": query_embedding.tolist(),
             "match_threshold": 0.5,
             "match_count": 3
         }
@@ -73,7 +50,7 @@ try:
         print(f"   ✓ Found {len(search_result.data)} matching chunks:")
         for chunk in search_result.data:
             print(f"     - [{chunk['guest_name']}] {chunk['content'][:80]}...")
-            print(f"       Similarity: {chunk['similarity']:.3f}")
+            print(f"       Similarity: {1 - chunk['distance']:.3f}")
     else:
         print("   ⚠ No chunks found. Did the ingestion complete?")
 except Exception as e:
@@ -92,6 +69,28 @@ try:
 except Exception as e:
     print(f"   ✗ Error: {e}")
 
+# Test 5: Semantic cache keys (offline)
+print("\n5. Checking semantic cache keys...")
+try:
+    distinct = [
+        ("hire a VP Sales at $1M ARR", "hire a VP Marketing at $10M ARR"),
+        ("reduce churn for B2B SaaS", "reduce churn for B2C marketplace"),
+        ("grow retention 20% MoM", "grow retention 5% MoM"),
+        ("price our product", "position our product"),
+    ]
+    rephrased = [
+        ("How do I hire a VP of Sales?", "hire VP sales"),
+        ("What should our pricing strategy be", "Pricing strategy?"),
+    ]
+    collisions = [pair for pair in distinct if _semantic_cache_params(pair[0], {}) == _semantic_cache_params(pair[1], {})]
+    misses = [pair for pair in rephrased if _semantic_cache_params(pair[0], {}) != _semantic_cache_params(pair[1], {})]
+    if collisions or misses:
+        print(f"   ✗ Colliding: {collisions} Not shared: {misses}")
+    else:
+        print(f"   ✓ {len(distinct)} distinct questions keep separate keys, {len(rephrased)} rephrasings share one")
+except Exception as e:
+    print(f"   ✗ Error: {e}")
+
 print("\n" + "=" * 50)
 print("Tests complete!")
 print("=" * 50)
@@ -0,0 +1,64 @@
+-- Rewrite search_chunks so the pgvector index is actually used
+-- Postgres only walks the ANN index when rows are ordered by the raw distance
+-- operator ascending; filtering on a computed similarity expression forces a
+-- sequential scan + top-N sort. The nearest neighbours are now picked from
+-- transcript_chunks alone, then joined to episode/guest metadata.
+-- Returns the cosine distance; callers derive similarity as 1 - distance.
+
+DROP FUNCTION IF EXISTS search_chunks(VECTOR(768), FLOAT, INT);
+
+CREATE OR REPLACE FUNCTION search_chunks(
+    query_embedding VECTOR(768),
+    match_threshold FLOAT DEFAULT 0.7,
+    match_count INT DEFAULT 10
+)
+RETURNS TABLE (
+    chunk_id UUID,
+    episode_id UUID,
+    episode_title TEXT,
+    guest_name TEXT,
+    speaker TEXT,
+    content TEXT,
+    timestamp_start TEXT,
+    distance FLOAT
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    RETURN QUERY
+    WITH nearest AS (
+        SELECT
+            tc.id,
+            tc.episode_id,
+            tc.speaker,
+            tc.content,
+            tc.timestamp_start,
+            tc.embedding <=> query_embedding AS distance
+        FROM transcript_chunks tc
+        WHERE tc.embedding <=> query_embedding < 1 - match_threshold
+        ORDER BY tc.embedding <=> query_embedding ASC
+        LIMIT match_count
+    )
+    SELECT 
+        n.id AS chunk_id,
+        n.episode_id,
+        e.title AS episode_title,
+        g.name AS guest_name,
+        n.speaker,
+        n.content,
+        n.timestamp_start,
+        n.distance
+    FROM nearest n
+    JOIN episodes e ON n.episode_id = e.id
+    LEFT JOIN episode_guests eg ON e.id = eg.episode_id
+    LEFT JOIN guests g ON eg.guest_id = g.id
+    ORDER BY n.distance;
+END;
+$$;
+
+-- Verify the plan uses the index (expect "Index Scan using idx_transcript_chunks_embedding",
+-- not "Seq Scan on transcript_chunks"):
+--   EXPLAIN ANALYZE
+--   SELECT id FROM transcript_chunks
+--   ORDER BY embedding <=> (SELECT embedding FROM transcript_chunks LIMIT 1)
+--   LIMIT 10;
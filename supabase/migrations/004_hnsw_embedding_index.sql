@@ -0,0 +1,71 @@
+-- Replace the IVFFlat embedding index with a tuned HNSW index
+-- m = 24 / ef_construction = 128 builds a denser graph than the pgvector
+-- defaults (16 / 64): shorter walks to the top-k and higher recall.
+-- Requires pgvector >= 0.5.0 (enabled by default on Supabase).
+
+-- Give the build room to run; lower maintenance_work_mem on small instances
+SET max_parallel_maintenance_workers = 7;
+SET maintenance_work_mem = '2GB';
+
+DROP INDEX IF EXISTS idx_transcript_chunks_embedding;
+CREATE INDEX idx_transcript_chunks_embedding ON transcript_chunks
+    USING hnsw (embedding vector_cosine_ops) WITH (m = 24, ef_construction = 128);
+
+RESET max_parallel_maintenance_workers;
+RESET maintenance_work_mem;
+
+-- Recreate search_chunks with a per-call hnsw.ef_search (size of the search queue)
+-- set_config(..., true) is transaction-local, and each RPC runs in its own transaction
+DROP FUNCTION IF EXISTS search_chunks(VECTOR(768), FLOAT, INT);
+
+CREATE OR REPLACE FUNCTION search_chunks(
+    query_embedding VECTOR(768),
+    match_threshold FLOAT DEFAULT 0.7,
+    match_count INT DEFAULT 10,
+    ef_search INT DEFAULT 100
+)
+RETURNS TABLE (
+    chunk_id UUID,
+    episode_id UUID,
+    episode_title TEXT,
+    guest_name TEXT,
+    speaker TEXT,
+    content TEXT,
+    timestamp_start TEXT,
+    distance FLOAT
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    PERFORM set_config('hnsw.ef_search', ef_search::TEXT, true);
+
+    RETURN QUERY
+    WITH nearest AS (
+        SELECT
+            tc.id,
+            tc.episode_id,
+            tc.speaker,
+            tc.content,
+            tc.timestamp_start,
+            tc.embedding <=> query_embedding AS distance
+        FROM transcript_chunks tc
+        WHERE tc.embedding <=> query_embedding < 1 - match_threshold
+        ORDER BY tc.embedding <=> query_embedding ASC
+        LIMIT match_count
+    )
+    SELECT 
+        n.id AS chunk_id,
+        n.episode_id,
+        e.title AS episode_title,
+        g.name AS guest_name,
+        n.speaker,
+        n.content,
+        n.timestamp_start,
+        n.distance
+    FROM nearest n
+    JOIN episodes e ON n.episode_id = e.id
+    LEFT JOIN episode_guests eg ON e.id = eg.episode_id
+    LEFT JOIN guests g ON eg.guest_id = g.id
+    ORDER BY n.distance;
+END;
+$$;
@@ -0,0 +1,44 @@
+-- Semantic cache for synthesized LLM responses
+-- The MCP server embeds each synthesis prompt and reuses a prior response
+-- when a prompt of the same kind is within the similarity threshold.
+-- Expired rows are ignored; purge them periodically with:
+--   DELETE FROM response_cache WHERE expires_at < NOW();
+
+CREATE TABLE IF NOT EXISTS response_cache (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    kind TEXT NOT NULL,
+    prompt TEXT NOT NULL,
+    prompt_embedding VECTOR(768) NOT NULL,
+    response TEXT NOT NULL,
+    expires_at TIMESTAMPTZ NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_response_cache_embedding ON response_cache
+    USING hnsw (prompt_embedding vector_cosine_ops) WITH (m = 24, ef_construction = 128);
+
+-- Function to find a cached response for a similar prompt
+CREATE OR REPLACE FUNCTION match_cached_response(
+    query_embedding VECTOR(768),
+    cache_kind TEXT,
+    match_threshold FLOAT DEFAULT 0.95
+)
+RETURNS TABLE (
+    response TEXT,
+    distance FLOAT
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        rc.response,
+        rc.prompt_embedding <=> query_embedding AS distance
+    FROM response_cache rc
+    WHERE rc.prompt_embedding <=> query_embedding < 1 - match_threshold
+      AND rc.kind = cache_kind
+      AND rc.expires_at > NOW()
+    ORDER BY rc.prompt_embedding <=> query_embedding ASC
+    LIMIT 1;
+END;
+$$;
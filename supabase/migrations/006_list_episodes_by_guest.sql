@@ -0,0 +1,49 @@
+-- List episodes featuring a guest in a single round-trip
+-- Replaces three sequential PostgREST calls (episodes, guests, episode_guests)
+-- and a Python-side join; the join now runs in-database on the
+-- episode_guests primary key. Search and limit apply after the guest filter.
+
+CREATE OR REPLACE FUNCTION list_episodes_by_guest(
+    guest_name TEXT,
+    search TEXT DEFAULT NULL,
+    sort_by TEXT DEFAULT 'views',
+    lim INT DEFAULT 10
+)
+RETURNS TABLE (
+    id UUID,
+    title TEXT,
+    slug TEXT,
+    youtube_url TEXT,
+    duration_display TEXT,
+    view_count INTEGER,
+    description TEXT
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        e.id,
+        e.title,
+        e.slug,
+        e.youtube_url,
+        e.duration_display,
+        e.view_count,
+        e.description
+    FROM episodes e
+    WHERE EXISTS (
+        SELECT 1
+        FROM episode_guests eg
+        JOIN guests g ON eg.guest_id = g.id
+        WHERE eg.episode_id = e.id
+          AND g.name ILIKE '%' || guest_name || '%'
+    )
+      AND (search IS NULL
+           OR e.title ILIKE '%' || search || '%'
+           OR e.description ILIKE '%' || search || '%')
+    ORDER BY
+        CASE WHEN sort_by = 'views' THEN e.view_count END DESC NULLS LAST,
+        CASE WHEN sort_by = 'duration' THEN e.duration_seconds END DESC NULLS LAST
+    LIMIT lim;
+END;
+$$;
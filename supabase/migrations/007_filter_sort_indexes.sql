@@ -0,0 +1,13 @@
+-- Indexes for list_episodes filter and sort pushdown
+-- A trigram GIN index lets guests.name ILIKE '%...%' use an index instead of
+-- a sequential scan; descending btrees turn ORDER BY ... LIMIT into a read
+-- from the top of the index. NULLS LAST matches how the server sorts.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_guests_name_trgm ON guests
+    USING gin (name gin_trgm_ops);
+
+DROP INDEX IF EXISTS idx_episodes_view_count;
+CREATE INDEX idx_episodes_view_count ON episodes (view_count DESC NULLS LAST);
+CREATE INDEX IF NOT EXISTS idx_episodes_duration ON episodes (duration_seconds DESC NULLS LAST);
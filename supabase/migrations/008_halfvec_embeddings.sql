@@ -0,0 +1,75 @@
+-- Store chunk embeddings as half-precision vectors
+-- halfvec(768) is 1536 bytes per row instead of 3072, which halves the HNSW
+-- index and the memory each distance computation reads. Recall for cosine
+-- ranking is effectively unchanged.
+-- Requires pgvector >= 0.7.0.
+
+SET max_parallel_maintenance_workers = 7;
+SET maintenance_work_mem = '2GB';
+
+DROP INDEX IF EXISTS idx_transcript_chunks_embedding;
+
+ALTER TABLE transcript_chunks
+    ALTER COLUMN embedding TYPE HALFVEC(768) USING embedding::HALFVEC(768);
+
+CREATE INDEX idx_transcript_chunks_embedding ON transcript_chunks
+    USING hnsw (embedding halfvec_cosine_ops) WITH (m = 24, ef_construction = 128);
+
+RESET max_parallel_maintenance_workers;
+RESET maintenance_work_mem;
+
+-- Callers still pass a full-precision vector; cast it once so the distance
+-- operator matches the halfvec index
+CREATE OR REPLACE FUNCTION search_chunks(
+    query_embedding VECTOR(768),
+    match_threshold FLOAT DEFAULT 0.7,
+    match_count INT DEFAULT 10,
+    ef_search INT DEFAULT 100
+)
+RETURNS TABLE (
+    chunk_id UUID,
+    episode_id UUID,
+    episode_title TEXT,
+    guest_name TEXT,
+    speaker TEXT,
+    content TEXT,
+    timestamp_start TEXT,
+    distance FLOAT
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    query_halfvec HALFVEC(768) := query_embedding::HALFVEC(768);
+BEGIN
+    PERFORM set_config('hnsw.ef_search', ef_search::TEXT, true);
+
+    RETURN QUERY
+    WITH nearest AS (
+        SELECT
+            tc.id,
+            tc.episode_id,
+            tc.speaker,
+            tc.content,
+            tc.timestamp_start,
+            tc.embedding <=> query_halfvec AS distance
+        FROM transcript_chunks tc
+        WHERE tc.embedding <=> query_halfvec < 1 - match_threshold
+        ORDER BY tc.embedding <=> query_halfvec ASC
+        LIMIT match_count
+    )
+    SELECT 
+        n.id AS chunk_id,
+        n.episode_id,
+        e.title AS episode_title,
+        g.name AS guest_name,
+        n.speaker,
+        n.content,
+        n.timestamp_start,
+        n.distance
+    FROM nearest n
+    JOIN episodes e ON n.episode_id = e.id
+    LEFT JOIN episode_guests eg ON e.id = eg.episode_id
+    LEFT JOIN guests g ON eg.guest_id = g.id
+    ORDER BY n.distance;
+END;
+$$;
@@ -0,0 +1,64 @@
+-- Optionally return chunk embeddings from search_chunks
+-- The synthesis tools re-rank retrieved chunks with MMR (relevance minus
+-- redundancy) before building the LLM prompt, which needs the chunk vectors.
+-- search_wisdom leaves include_embedding off and pays nothing extra.
+
+DROP FUNCTION IF EXISTS search_chunks(VECTOR(768), FLOAT, INT, INT);
+
+CREATE OR REPLACE FUNCTION search_chunks(
+    query_embedding VECTOR(768),
+    match_threshold FLOAT DEFAULT 0.7,
+    match_count INT DEFAULT 10,
+    ef_search INT DEFAULT 100,
+    include_embedding BOOLEAN DEFAULT false
+)
+RETURNS TABLE (
+    chunk_id UUID,
+    episode_id UUID,
+    episode_title TEXT,
+    guest_name TEXT,
+    speaker TEXT,
+    content TEXT,
+    timestamp_start TEXT,
+    distance FLOAT,
+    embedding HALFVEC(768)
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    query_halfvec HALFVEC(768) := query_embedding::HALFVEC(768);
+BEGIN
+    PERFORM set_config('hnsw.ef_search', ef_search::TEXT, true);
+
+    RETURN QUERY
+    WITH nearest AS (
+        SELECT
+            tc.id,
+            tc.episode_id,
+            tc.speaker,
+            tc.content,
+            tc.timestamp_start,
+            tc.embedding <=> query_halfvec AS distance,
+            CASE WHEN include_embedding THEN tc.embedding END AS embedding
+        FROM transcript_chunks tc
+        WHERE tc.embedding <=> query_halfvec < 1 - match_threshold
+        ORDER BY tc.embedding <=> query_halfvec ASC
+        LIMIT match_count
+    )
+    SELECT 
+        n.id AS chunk_id,
+        n.episode_id,
+        e.title AS episode_title,
+        g.name AS guest_name,
+        n.speaker,
+        n.content,
+        n.timestamp_start,
+        n.distance,
+        n.embedding
+    FROM nearest n
+    JOIN episodes e ON n.episode_id = e.id
+    LEFT JOIN episode_guests eg ON e.id = eg.episode_id
+    LEFT JOIN guests g ON eg.guest_id = g.id
+    ORDER BY n.distance;
+END;
+$$;
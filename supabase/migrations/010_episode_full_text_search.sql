@@ -0,0 +1,95 @@
+-- Full-text search over episode titles and descriptions
+-- Replaces unanchored ILIKE '%...%' filters (always a sequential scan) with a
+-- GIN-indexed tsvector. The search text is passed as a bound parameter to
+-- websearch_to_tsquery, never spliced into a PostgREST filter string.
+
+ALTER TABLE episodes ADD COLUMN IF NOT EXISTS search_tsv TSVECTOR
+    GENERATED ALWAYS AS (
+        to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, ''))
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_episodes_search_tsv ON episodes USING gin (search_tsv);
+
+-- Search episodes by free text (supports "quoted phrases", OR and -exclusions)
+CREATE OR REPLACE FUNCTION search_episodes(
+    q TEXT,
+    sort_by TEXT DEFAULT 'views',
+    lim INT DEFAULT 10
+)
+RETURNS TABLE (
+    id UUID,
+    title TEXT,
+    slug TEXT,
+    youtube_url TEXT,
+    duration_display TEXT,
+    view_count INTEGER,
+    description TEXT
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    query TSQUERY := websearch_to_tsquery('english', q);
+BEGIN
+    RETURN QUERY
+    SELECT
+        e.id,
+        e.title,
+        e.slug,
+        e.youtube_url,
+        e.duration_display,
+        e.view_count,
+        e.description
+    FROM episodes e
+    WHERE e.search_tsv @@ query
+    ORDER BY
+        CASE WHEN sort_by = 'views' THEN e.view_count END DESC NULLS LAST,
+        CASE WHEN sort_by = 'duration' THEN e.duration_seconds END DESC NULLS LAST,
+        ts_rank(e.search_tsv, query) DESC
+    LIMIT lim;
+END;
+$$;
+
+-- Use the same full-text match for the search filter when listing by guest
+CREATE OR REPLACE FUNCTION list_episodes_by_guest(
+    guest_name TEXT,
+    search TEXT DEFAULT NULL,
+    sort_by TEXT DEFAULT 'views',
+    lim INT DEFAULT 10
+)
+RETURNS TABLE (
+    id UUID,
+    title TEXT,
+    slug TEXT,
+    youtube_url TEXT,
+    duration_display TEXT,
+    view_count INTEGER,
+    description TEXT
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        e.id,
+        e.title,
+        e.slug,
+        e.youtube_url,
+        e.duration_display,
+        e.view_count,
+        e.description
+    FROM episodes e
+    WHERE EXISTS (
+        SELECT 1
+        FROM episode_guests eg
+        JOIN guests g ON eg.guest_id = g.id
+        WHERE eg.episode_id = e.id
+          AND g.name ILIKE '%' || guest_name || '%'
+    )
+      AND (search IS NULL
+           OR e.search_tsv @@ websearch_to_tsquery('english', search))
+    ORDER BY
+        CASE WHEN sort_by = 'views' THEN e.view_count END DESC NULLS LAST,
+        CASE WHEN sort_by = 'duration' THEN e.duration_seconds END DESC NULLS LAST
+    LIMIT lim;
+END;
+$$;
@@ -0,0 +1,80 @@
+-- Filter search_chunks by expert inside the database
+-- compare_experts used to post-filter the top-15 chunks in Python, which
+-- often left nothing when the requested experts were not in that top-15.
+-- The guest filter now runs alongside the HNSW scan, and iterative index
+-- scans keep walking the graph until enough matching chunks are found.
+-- Requires pgvector >= 0.8.0 (hnsw.iterative_scan).
+
+DROP FUNCTION IF EXISTS search_chunks(VECTOR(768), FLOAT, INT, INT, BOOLEAN);
+
+CREATE OR REPLACE FUNCTION search_chunks(
+    query_embedding VECTOR(768),
+    match_threshold FLOAT DEFAULT 0.7,
+    match_count INT DEFAULT 10,
+    ef_search INT DEFAULT 100,
+    include_embedding BOOLEAN DEFAULT false,
+    expert_names TEXT[] DEFAULT NULL
+)
+RETURNS TABLE (
+    chunk_id UUID,
+    episode_id UUID,
+    episode_title TEXT,
+    guest_name TEXT,
+    speaker TEXT,
+    content TEXT,
+    timestamp_start TEXT,
+    distance FLOAT,
+    embedding HALFVEC(768)
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    query_halfvec HALFVEC(768) := query_embedding::HALFVEC(768);
+    -- Substring, case-insensitive match on guest names
+    expert_patterns TEXT[] := (SELECT array_agg('%' || n || '%') FROM unnest(expert_names) AS n);
+BEGIN
+    PERFORM set_config('hnsw.ef_search', ef_search::TEXT, true);
+    IF expert_patterns IS NOT NULL THEN
+        PERFORM set_config('hnsw.iterative_scan', 'relaxed_order', true);
+    END IF;
+
+    RETURN QUERY
+    WITH nearest AS MATERIALIZED (
+        SELECT
+            tc.id,
+            tc.episode_id,
+            tc.speaker,
+            tc.content,
+            tc.timestamp_start,
+            tc.embedding <=> query_halfvec AS distance,
+            CASE WHEN include_embedding THEN tc.embedding END AS embedding
+        FROM transcript_chunks tc
+        WHERE tc.embedding <=> query_halfvec < 1 - match_threshold
+          AND (expert_patterns IS NULL OR EXISTS (
+              SELECT 1
+              FROM episode_guests eg
+              JOIN guests g ON eg.guest_id = g.id
+              WHERE eg.episode_id = tc.episode_id
+                AND g.name ILIKE ANY (expert_patterns)
+          ))
+        ORDER BY tc.embedding <=> query_halfvec ASC
+        LIMIT match_count
+    )
+    SELECT 
+        n.id AS chunk_id,
+        n.episode_id,
+        e.title AS episode_title,
+        g.name AS guest_name,
+        n.speaker,
+        n.content,
+        n.timestamp_start,
+        n.distance,
+        n.embedding
+    FROM nearest n
+    JOIN episodes e ON n.episode_id = e.id
+    LEFT JOIN episode_guests eg ON e.id = eg.episode_id
+    LEFT JOIN guests g ON eg.guest_id = g.id
+    WHERE expert_patterns IS NULL OR g.name ILIKE ANY (expert_patterns)
+    ORDER BY n.distance;
+END;
+$$;
@@ -0,0 +1,6 @@
+-- Track which transcript version each episode's chunks were embedded from
+-- The ingester writes SHA-256 of transcript_raw here after an episode's
+-- chunks are stored, and skips re-embedding when the hash is unchanged.
+-- NULL means the chunks have not been (fully) ingested yet.
+
+ALTER TABLE episodes ADD COLUMN IF NOT EXISTS content_hash TEXT;
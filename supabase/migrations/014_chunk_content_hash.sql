@@ -0,0 +1,6 @@
+-- Per-chunk content hash for incremental re-ingestion
+-- The ingester stores MD5 of each chunk's content and, when an episode's
+-- transcript changes, only re-embeds chunks whose hash differs at the same
+-- chunk_index. Existing rows start as NULL and are re-embedded once.
+
+ALTER TABLE transcript_chunks ADD COLUMN IF NOT EXISTS content_hash TEXT;
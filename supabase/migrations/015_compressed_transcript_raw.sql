@@ -0,0 +1,8 @@
+-- Store the raw transcript archive gzip-compressed
+-- transcript_raw is only kept as an archive (chunks hold the searchable
+-- text), so the ingester now sends base64-encoded gzip in transcript_raw_gz,
+-- roughly a fifth of the payload, and clears transcript_raw on upsert.
+-- Postgres has no built-in gunzip, so decompress client-side:
+--   gzip.decompress(base64.b64decode(row["transcript_raw_gz"])).decode()
+
+ALTER TABLE episodes ADD COLUMN IF NOT EXISTS transcript_raw_gz TEXT;
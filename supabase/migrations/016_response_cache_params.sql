@@ -0,0 +1,40 @@
+-- Key the semantic response cache on the user's inputs plus exact parameters
+-- The server now embeds only the user's own free text (not the templated
+-- prompt, whose fixed wording made different requests look near-identical)
+-- and stores the parameters that decide the answer (e.g. the experts being
+-- compared, the metrics category) in a normalized JSONB column that must
+-- match exactly. Existing rows were embedded from full prompts, so they are
+-- not comparable and are cleared.
+
+DELETE FROM response_cache;
+
+ALTER TABLE response_cache ADD COLUMN IF NOT EXISTS params JSONB NOT NULL DEFAULT '{}'::jsonb;
+
+DROP FUNCTION IF EXISTS match_cached_response(VECTOR(768), TEXT, FLOAT);
+
+CREATE OR REPLACE FUNCTION match_cached_response(
+    query_embedding VECTOR(768),
+    cache_kind TEXT,
+    cache_params JSONB DEFAULT '{}'::jsonb,
+    match_threshold FLOAT DEFAULT 0.95
+)
+RETURNS TABLE (
+    response TEXT,
+    distance FLOAT
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        rc.response,
+        rc.prompt_embedding <=> query_embedding AS distance
+    FROM response_cache rc
+    WHERE rc.prompt_embedding <=> query_embedding < 1 - match_threshold
+      AND rc.kind = cache_kind
+      AND rc.params = cache_params
+      AND rc.expires_at > NOW()
+    ORDER BY rc.prompt_embedding <=> query_embedding ASC
+    LIMIT 1;
+END;
+$$;
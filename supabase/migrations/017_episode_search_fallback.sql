@@ -0,0 +1,101 @@
+-- Fall back to substring matching when a search has no full-text terms
+-- websearch_to_tsquery drops stopwords and punctuation, so a search like
+-- "the one" or "how to" produced an empty tsquery and matched no episodes
+-- at all. Such searches now use an escaped ILIKE over title and description,
+-- as before 010. Searches with real words keep the indexed full-text match,
+-- which is word based (stemmed), not substring or prefix based.
+-- Also renames the plpgsql variable `query`, easily confused with RETURN QUERY.
+
+CREATE OR REPLACE FUNCTION search_episodes(
+    q TEXT,
+    sort_by TEXT DEFAULT 'views',
+    lim INT DEFAULT 10
+)
+RETURNS TABLE (
+    id UUID,
+    title TEXT,
+    slug TEXT,
+    youtube_url TEXT,
+    duration_display TEXT,
+    view_count INTEGER,
+    description TEXT
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    ts_query TSQUERY := websearch_to_tsquery('english', q);
+    use_fts BOOLEAN := numnode(ts_query) > 0;
+    pattern TEXT := '%' || replace(replace(replace(q, '\', '\\'), '%', '\%'), '_', '\_') || '%';
+BEGIN
+    RETURN QUERY
+    SELECT
+        e.id,
+        e.title,
+        e.slug,
+        e.youtube_url,
+        e.duration_display,
+        e.view_count,
+        e.description
+    FROM episodes e
+    WHERE CASE
+        WHEN use_fts THEN e.search_tsv @@ ts_query
+        ELSE e.title ILIKE pattern OR e.description ILIKE pattern
+    END
+    ORDER BY
+        CASE WHEN sort_by = 'views' THEN e.view_count END DESC NULLS LAST,
+        CASE WHEN sort_by = 'duration' THEN e.duration_seconds END DESC NULLS LAST,
+        ts_rank(e.search_tsv, ts_query) DESC
+    LIMIT lim;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION list_episodes_by_guest(
+    guest_name TEXT,
+    search TEXT DEFAULT NULL,
+    sort_by TEXT DEFAULT 'views',
+    lim INT DEFAULT 10
+)
+RETURNS TABLE (
+    id UUID,
+    title TEXT,
+    slug TEXT,
+    youtube_url TEXT,
+    duration_display TEXT,
+    view_count INTEGER,
+    description TEXT
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    ts_query TSQUERY := websearch_to_tsquery('english', coalesce(search, ''));
+    use_fts BOOLEAN := numnode(ts_query) > 0;
+    pattern TEXT := '%' || replace(replace(replace(search, '\', '\\'), '%', '\%'), '_', '\_') || '%';
+BEGIN
+    RETURN QUERY
+    SELECT
+        e.id,
+        e.title,
+        e.slug,
+        e.youtube_url,
+        e.duration_display,
+        e.view_count,
+        e.description
+    FROM episodes e
+    WHERE EXISTS (
+        SELECT 1
+        FROM episode_guests eg
+        JOIN guests g ON eg.guest_id = g.id
+        WHERE eg.episode_id = e.id
+          AND g.name ILIKE '%' || guest_name || '%'
+    )
+      AND (search IS NULL
+           OR CASE
+               WHEN use_fts THEN e.search_tsv @@ ts_query
+               ELSE e.title ILIKE pattern OR e.description ILIKE pattern
+           END)
+    ORDER BY
+        CASE WHEN sort_by = 'views' THEN e.view_count END DESC NULLS LAST,
+        CASE WHEN sort_by = 'duration' THEN e.duration_seconds END DESC NULLS LAST
+    LIMIT lim;
+END;
+$$;